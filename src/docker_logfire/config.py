@@ -1,8 +1,14 @@
 """Configuration settings for docker-logfire."""
 
+import os
+from functools import cached_property, lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Async client connections kept free beyond the log streams, for the event subscription
+_STREAM_POOL_HEADROOM = 4
+
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -11,6 +17,7 @@ class Settings(BaseSettings):
         env_file=".env",
         env_ignore_empty=True,
         extra="ignore",
+        frozen=True,
     )
 
     # Logfire settings
@@ -19,6 +26,11 @@ class Settings(BaseSettings):
 
     # Docker settings
     docker_socket: str = Field(default="/var/run/docker.sock", description="Path to Docker socket")
+    docker_timeout: int = Field(default=60, description="Timeout in seconds for Docker API calls")
+    docker_pool_size: int | None = Field(
+        default=None,
+        description="Maximum pooled connections to the Docker socket (derived when unset)",
+    )
 
     # Container filtering  
     exclude_containers: str = Field(
@@ -26,12 +38,75 @@ class Settings(BaseSettings):
         description="Comma-separated container names to exclude from log collection",
     )
     include_stopped: bool = Field(default=False, description="Include logs from stopped containers")
+    max_concurrent_streams: int | None = Field(
+        default=None,
+        gt=0,
+        description="Maximum container log streams followed at the same time (unset: no limit)",
+    )
+    max_retry_delay: int = Field(
+        default=30, description="Upper bound in seconds for log stream retry delays"
+    )
+    retry_jitter: float = Field(
+        default=0.5, description="Random extra fraction added to each retry delay"
+    )
+
+    # Log batching
+    log_batch_size: int = Field(
+        default=200, description="Maximum log lines sent to Logfire in one record"
+    )
+    log_batch_wait: float = Field(
+        default=0.25, description="Seconds to wait for more lines before flushing a batch"
+    )
+
+    # Lifecycle event batching
+    event_batch_size: int = Field(
+        default=50, description="Maximum lifecycle events forwarded to Logfire at once"
+    )
+    event_batch_ms: int = Field(
+        default=50, description="Milliseconds to wait for more lifecycle events per batch"
+    )
+
+    # Runtime settings
+    executor_workers: int = Field(
+        default_factory=lambda: (os.cpu_count() or 1) * 4,
+        description="Worker threads for blocking Docker API calls",
+    )
+    use_uvloop: bool = Field(default=True, description="Run on uvloop when it is installed")
 
     # Logging settings
     log_level: str = Field(default="INFO", description="Application log level")
 
-    def get_exclude_containers(self) -> list[str]:
-        """Get list of containers to exclude."""
-        if not self.exclude_containers:
-            return []
-        return [name.strip() for name in self.exclude_containers.split(",") if name.strip()]
+    @cached_property
+    def docker_url(self) -> str:
+        """Docker socket path as a client base URL, resolved once."""
+        return f"unix://{self.docker_socket}"
+
+    @cached_property
+    def docker_pool_connections(self) -> int:
+        """Connection pool size for the synchronous Docker client."""
+        if self.docker_pool_size is not None:
+            return self.docker_pool_size
+        # Only executor threads use this client, and each holds one connection at a time
+        return self.executor_workers
+
+    @cached_property
+    def stream_pool_connections(self) -> int:
+        """Connection limit for the async Docker client, 0 meaning unlimited."""
+        # Every followed log stream holds a connection until its container stops, so
+        # without a stream cap any fixed limit would eventually block new streams
+        if self.max_concurrent_streams is None:
+            return 0
+        return self.max_concurrent_streams + _STREAM_POOL_HEADROOM
+
+    @cached_property
+    def exclude_set(self) -> frozenset[str]:
+        """Set of container names to exclude, parsed once on first access."""
+        return frozenset(
+            name.strip() for name in self.exclude_containers.split(",") if name.strip()
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings instance, loading it on first call."""
+    return Settings()  # type: ignore[call-arg]
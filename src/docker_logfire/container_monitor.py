@@ -2,9 +2,10 @@
 
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import random
 from typing import Any
 
+import aiodocker
 import docker
 from docker.errors import DockerException
 from docker.models.containers import Container
@@ -13,36 +14,86 @@ from .config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Reconnect delays for the Docker event stream, in seconds
+_EVENT_RETRY_BASE_DELAY = 0.5
+_EVENT_RETRY_MAX_DELAY = 30.0
+
+# Container lifecycle events the app reacts to; the daemon filters out the rest
+_MONITORED_EVENTS = ["start", "stop", "die"]
+
 
 class ContainerMonitor:
     """Monitors Docker containers and manages their lifecycle."""
 
-    def __init__(self, settings: Settings) -> None:
-        """Initialize the container monitor."""
+    def __init__(
+        self, settings: Settings, client: docker.DockerClient, aio_client: aiodocker.Docker
+    ) -> None:
+        """Initialize the container monitor with shared Docker clients."""
         self.settings = settings
-        self.client = docker.DockerClient(base_url=f"unix://{settings.docker_socket}")
+        self.client = client
+        self.aio_client = aio_client
         self.active_containers: set[str] = set()
-        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._event_retry_delay = _EVENT_RETRY_BASE_DELAY
+        self._name_cache: dict[str, str] = {}
+        self._image_cache: dict[str, str] = {}
+        # The level is set before the monitor starts, so check it once rather than per event
+        self._log_events = logger.isEnabledFor(logging.INFO)
 
     def get_container_name(self, container: Container) -> str:
-        """Extract container name without leading slash."""
-        if container.name:
-            return container.name.lstrip("/")
-        return container.short_id
+        """Get the container name without leading slash, cached per container."""
+        name = self._name_cache.get(container.short_id)
+        if name is None:
+            name = self._resolve_name(container)
+            self._name_cache[container.short_id] = name
+        return name
+
+    def get_container_image(self, container: Container) -> str:
+        """Get the container's first image tag, cached per container."""
+        image = self._image_cache.get(container.short_id)
+        if image is None:
+            image = self._resolve_image(container)
+            self._image_cache[container.short_id] = image
+        return image
+
+    def forget_container(self, container_id: str) -> None:
+        """Drop cached lookups for a container that has stopped."""
+        short_id = container_id[:12]
+        self._name_cache.pop(short_id, None)
+        self._image_cache.pop(short_id, None)
+
+    @staticmethod
+    def _resolve_name(container: Container) -> str:
+        """Get the container name, falling back to its short ID."""
+        # docker-py's Container.name already drops Docker's leading slash
+        return container.name or container.short_id
+
+    @staticmethod
+    def _resolve_image(container: Container) -> str:
+        """Look up the container's first image tag (an API call in docker-py)."""
+        try:
+            image = container.image
+        except DockerException as e:
+            # The tag is only metadata; don't let a failed lookup stop the log stream
+            logger.debug("Failed to look up image for %s: %s", container.short_id, e)
+            return "unknown"
+
+        if image and image.tags:
+            return image.tags[0]
+        return "unknown"
 
     def should_monitor_container(self, container: Container) -> bool:
         """Check if container should be monitored based on settings."""
         container_name = self.get_container_name(container)
 
         # Check exclusion list
-        if container_name in self.settings.get_exclude_containers():
-            logger.debug(f"Skipping excluded container: {container_name}")
+        if container_name in self.settings.exclude_set:
+            logger.debug("Skipping excluded container: %s", container_name)
             return False
 
         # Check container status
         if container.status != "running" and not self.settings.include_stopped:
             logger.debug(
-                f"Skipping non-running container: {container_name} (status: {container.status})"
+                "Skipping non-running container: %s (status: %s)", container_name, container.status
             )
             return False
 
@@ -55,62 +106,58 @@ class ContainerMonitor:
             monitored = [c for c in containers if self.should_monitor_container(c)]
 
             logger.info(
-                f"Found {len(monitored)} containers to monitor out of {len(containers)} total"
+                "Found %d containers to monitor out of %d total", len(monitored), len(containers)
             )
             for container in monitored:
-                logger.info(f"Will monitor container: {self.get_container_name(container)}")
+                logger.info("Will monitor container: %s", self.get_container_name(container))
 
             return monitored
         except DockerException as e:
-            logger.error(f"Failed to list containers: {e}")
+            logger.error("Failed to list containers: %s", e)
             return []
 
-    def _watch_events_blocking(self) -> Any:
-        """Blocking version of event watching for thread execution."""
-        return self.client.events(filters={"type": "container"}, decode=True)  # type: ignore[no-untyped-call]
-
     async def watch_events(self, event_callback: Any) -> None:
         """Watch for container lifecycle events."""
         logger.info("Starting container event monitor")
-        
+
         while True:
             try:
-                # Run the blocking Docker events call in a thread
-                loop = asyncio.get_event_loop()
-                events_iter = await loop.run_in_executor(
-                    self.executor, self._watch_events_blocking
-                )
-                
-                # Process events (this will block in the thread)
-                await loop.run_in_executor(
-                    self.executor,
-                    self._process_events,
-                    events_iter,
-                    event_callback,
-                    loop
-                )
-                
+                await self._consume_events(event_callback)
+                logger.warning("Container event stream closed")
             except Exception as e:
-                logger.error(f"Error watching container events: {e}")
-                # Wait before retrying
-                await asyncio.sleep(5)
-                logger.info("Retrying container event monitoring...")
-    
-    def _process_events(self, events_iter: Any, event_callback: Any, loop: asyncio.AbstractEventLoop) -> None:
-        """Process events in the executor thread."""
-        for event in events_iter:
-            if event.get("status") in ["start", "stop", "die"]:
-                container_id = event.get("id", "")[:12]
-                container_name = (
-                    event.get("Actor", {}).get("Attributes", {}).get("name", "unknown")
-                )
-                status = event.get("status")
-
-                logger.info(f"Container event: {container_name} ({container_id}) - {status}")
-
+                logger.error("Error watching container events: %s", e)
+
+            # Back off exponentially with jitter so reconnects don't synchronize
+            delay = self._event_retry_delay + random.uniform(0, 0.5 * self._event_retry_delay)
+            self._event_retry_delay = min(self._event_retry_delay * 2, _EVENT_RETRY_MAX_DELAY)
+            logger.info("Retrying container event monitoring in %.1fs...", delay)
+            await asyncio.sleep(delay)
+
+    async def _consume_events(self, event_callback: Any) -> None:
+        """Read the Docker event stream until it closes."""
+        subscriber = self.aio_client.events.subscribe(  # type: ignore[no-untyped-call]
+            filters={"type": ["container"], "event": _MONITORED_EVENTS}
+        )
+        try:
+            while (event := await subscriber.get()) is not None:
+                # The stream is healthy again, so the next failure starts a fresh backoff
+                self._event_retry_delay = _EVENT_RETRY_BASE_DELAY
+
+                if self._log_events:
+                    container_id = event.get("id", "")[:12]
+                    container_name = (
+                        event.get("Actor", {}).get("Attributes", {}).get("name", "unknown")
+                    )
+                    status = event.get("status")
+                    logger.info(
+                        "Container event: %s (%s) - %s", container_name, container_id, status
+                    )
+
+                # The callback only queues work, so awaiting it can't stall the stream
                 try:
-                    # Schedule the callback in the main event loop
-                    future = asyncio.run_coroutine_threadsafe(event_callback(event), loop)
-                    future.result(timeout=10)  # Wait up to 10 seconds
+                    await event_callback(event)
                 except Exception as e:
-                    logger.error(f"Error processing container event: {e}")
+                    logger.error("Error processing container event: %s", e)
+        finally:
+            # Stop the background reader; re-raises any error that ended the stream
+            await self.aio_client.events.stop()  # type: ignore[no-untyped-call]
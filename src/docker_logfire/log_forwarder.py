@@ -1,10 +1,13 @@
 """Forward container logs to Logfire."""
 
-import json
+import asyncio
 import logging
+from collections import deque
 from typing import Any
 
+import aiodocker
 import logfire
+import orjson
 from docker.models.containers import Container
 
 from .config import Settings
@@ -15,110 +18,182 @@ logger = logging.getLogger(__name__)
 class LogForwarder:
     """Forwards container logs to Logfire with proper service attribution."""
 
-    def __init__(self, settings: Settings) -> None:
-        """Initialize the log forwarder and configure Logfire."""
+    def __init__(self, settings: Settings, client: aiodocker.Docker) -> None:
+        """Initialize the log forwarder; Logfire is configured on first use."""
         self.settings = settings
+        self.client = client
+        self._configured = False
+
+    def ensure_configured(self) -> None:
+        """Configure Logfire once, before the first record is sent."""
+        if self._configured:
+            return
 
         # Configure Logfire with the configurable service name
         logfire.configure(
-            token=settings.logfire_token,
-            service_name=settings.service_name,
+            token=self.settings.logfire_token,
+            service_name=self.settings.service_name,
             send_to_logfire=True,
         )
+        self._configured = True
 
-
-    def parse_docker_log(self, log_line: bytes) -> tuple[str, dict[str, Any]]:
+    def parse_docker_log(self, log_line: str) -> tuple[str, dict[str, Any]]:
         """Parse Docker log line and extract message and metadata."""
-        try:
-            # Docker logs come as bytes, decode them
-            log_str = log_line.decode("utf-8").strip()
-            
-            # When using timestamps=True, Docker prepends RFC3339 timestamp
-            # Format: 2025-05-23T20:03:59.691483928Z <actual log>
-            timestamp = None
-            if log_str and len(log_str) > 30 and log_str[4] == '-' and log_str[19] == 'T':
-                # Extract timestamp and actual log message
-                parts = log_str.split(' ', 1)
-                if len(parts) == 2:
-                    timestamp = parts[0]
-                    log_str = parts[1]
-
-            # Try to parse as JSON (common for structured logs)
+        log_str = log_line.rstrip()
+
+        # When using timestamps=True, Docker prepends RFC3339 timestamp
+        # Format: 2025-05-23T20:03:59.691483928Z <actual log>
+        timestamp = None
+        if log_str[4:5] == "-" and log_str[10:11] == "T":
+            # The separator follows the timestamp, so only scan where it can be
+            sep = log_str.find(" ", 20, 40)
+            if sep != -1:
+                timestamp = log_str[:sep]
+                log_str = log_str[sep + 1 :]
+
+        # Try to parse as JSON (common for structured logs). Only objects carry
+        # fields, so plain text skips the attempt and its raised decode error.
+        if log_str[:1] == "{":
             try:
-                log_data = json.loads(log_str)
-                if isinstance(log_data, dict):
-                    # Extract message if it exists
-                    message = log_data.pop("message", log_str)
-                    if timestamp:
-                        log_data["docker_timestamp"] = timestamp
-                    return message, log_data
-                else:
-                    extra_data = {"docker_timestamp": timestamp} if timestamp else {}
-                    return log_str, extra_data
-            except json.JSONDecodeError:
-                # Plain text log
-                extra_data = {"docker_timestamp": timestamp} if timestamp else {}
-                return log_str, extra_data
-
-        except Exception as e:
-            logger.error(f"Failed to parse log line: {e}")
-            return str(log_line), {"parse_error": str(e)}
-
-    async def stream_container_logs(self, container: Container) -> None:
-        """Stream logs from a container to Logfire."""
-        container_name = container.name.lstrip("/") if container.name else container.short_id
-        
-        logger.info(f"Starting log stream for container: {container_name}")
+                log_data = orjson.loads(log_str)
+            except orjson.JSONDecodeError:
+                log_data = None
+
+            if isinstance(log_data, dict):
+                # Extract message if it exists
+                message = log_data.pop("message", log_str)
+                if timestamp:
+                    log_data["docker_timestamp"] = timestamp
+                return message, log_data
+
+        # Plain text log
+        extra_data = {"docker_timestamp": timestamp} if timestamp else {}
+        return log_str, extra_data
+
+    async def stream_container_logs(
+        self,
+        container: Container,
+        container_name: str,
+        container_image: str,
+        stream_started: asyncio.Event | None = None,
+    ) -> None:
+        """Stream logs from a container to Logfire.
+
+        If given, ``stream_started`` is set once the first line arrives or the stream ends.
+        Stream errors propagate so the caller can decide whether to retry.
+        """
+        logger.info("Starting log stream for container: %s", container_name)
+
+        # Container metadata is the same for every line, so build it once per stream
+        base_meta: dict[str, Any] = {
+            "container_id": container.short_id,
+            "container_name": container_name,
+            "container_image": container_image,
+        }
+
+        batch: deque[tuple[str, dict[str, Any]]] = deque()
+        pending = asyncio.Event()
+        flusher = asyncio.create_task(self._flush_on_timer(batch, pending, base_meta))
 
         try:
-            # Get log stream from container
-            log_stream = container.logs(
-                stream=True,
+            # Follow the log stream asynchronously so all containers share the event loop
+            log_stream = self.client.containers.container(container.short_id).log(
+                stdout=True,
+                stderr=True,
                 follow=True,
                 timestamps=True,
                 tail=100,  # Start with last 100 lines
             )
 
-            for log_line in log_stream:
+            async for log_line in log_stream:
+                if stream_started is not None:
+                    stream_started.set()
+                    stream_started = None
+
                 if log_line:
-                    try:
-                        # Parse the log line
-                        message, extra_data = self.parse_docker_log(log_line)
-
-                        # Add container metadata
-                        container_image = "unknown"
-                        if container.image and container.image.tags:
-                            container_image = container.image.tags[0]
-
-                        log_data = {
-                            "container_id": container.short_id,
-                            "container_name": container_name,
-                            "container_image": container_image,
-                            **extra_data,
-                        }
-
-                        # Send to Logfire with container name in the data
-                        logfire.info(message, **log_data)
-                    except Exception as e:
-                        # Log error but continue processing
-                        logfire.error(f"Error processing log line for {container_name}: {e}")
-
-        except Exception as e:
-            logger.error(f"Error streaming logs for container {container_name}: {e}")
-            # Don't re-raise - let the task end gracefully
+                    # Buffer the parsed line; full batches are sent right away
+                    batch.append(self.parse_docker_log(log_line))
+                    if len(batch) >= self.settings.log_batch_size:
+                        self._flush_batch(batch, base_meta)
+                    else:
+                        pending.set()
+
         finally:
+            if stream_started is not None:
+                stream_started.set()
+            flusher.cancel()
+            self._flush_batch(batch, base_meta)
+            self.ensure_configured()
             logfire.info(f"Log stream ended for container: {container_name}")
 
-    async def handle_container_event(self, event: dict[str, Any]) -> None:
-        """Handle container lifecycle events."""
-        container_name = event.get("Actor", {}).get("Attributes", {}).get("name", "unknown")
-        status = event.get("status", "unknown")
+    async def _flush_on_timer(
+        self,
+        batch: deque[tuple[str, dict[str, Any]]],
+        pending: asyncio.Event,
+        base_meta: dict[str, Any],
+    ) -> None:
+        """Flush buffered lines once the oldest has waited for the batch window."""
+        while True:
+            await pending.wait()
+            await asyncio.sleep(self.settings.log_batch_wait)
+            pending.clear()
+            self._flush_batch(batch, base_meta)
+
+    def _flush_batch(
+        self, batch: deque[tuple[str, dict[str, Any]]], base_meta: dict[str, Any]
+    ) -> None:
+        """Send buffered log lines to Logfire as a single record."""
+        if not batch:
+            return
+
+        self.ensure_configured()
+
+        # A lone line keeps its own message so quiet containers read as before
+        if len(batch) == 1:
+            message, extra_data = batch.popleft()
+            logfire.info(message, **(base_meta | extra_data))
+            return
+
+        lines = [{"message": message, **extra_data} for message, extra_data in batch]
+        batch.clear()
+        logfire.info(
+            "{line_count} log lines from {container_name}",
+            **base_meta,
+            line_count=len(lines),
+            lines=lines,
+        )
+
+    async def handle_container_events(self, events: list[dict[str, Any]]) -> None:
+        """Log a batch of container lifecycle events."""
+        if not events:
+            return
+
+        self.ensure_configured()
+
+        records = [
+            {
+                "container_name": event.get("Actor", {})
+                .get("Attributes", {})
+                .get("name", "unknown"),
+                "status": event.get("status", "unknown"),
+                "container_id": event.get("id", "")[:12],
+            }
+            for event in events
+        ]
+
+        # A lone event keeps its own record so quiet hosts read as before
+        if len(records) == 1:
+            record = records[0]
+            logfire.info(
+                f"Container {record['status']}: {record['container_name']}",
+                event_type="container_lifecycle",
+                **record,
+            )
+            return
 
-        # Log the event itself
         logfire.info(
-            f"Container {status}: {container_name}",
+            "{event_count} container lifecycle events",
             event_type="container_lifecycle",
-            container_name=container_name,
-            status=status,
-            container_id=event.get("id", "")[:12],
+            event_count=len(records),
+            events=records,
         )
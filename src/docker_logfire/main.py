@@ -1,154 +1,457 @@
 """Main entry point for docker-logfire."""
 
 import asyncio
+import contextlib
 import logging
+import logging.handlers
+import queue
+import random
 import signal
 import sys
+from collections.abc import Callable, Coroutine
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+import aiodocker
+import aiohttp
+import docker
 import logfire
+from docker.errors import NotFound
 from docker.models.containers import Container
 
-from .config import Settings
+from .config import Settings, get_settings
 from .container_monitor import ContainerMonitor
 from .log_forwarder import LogForwarder
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
+# Statuses after which a container's log stream ends on its own
+_TERMINAL_STATUSES = frozenset({"stop", "die"})
+
+# Every container status handle_container_event acts on
+_HANDLED_STATUSES = _TERMINAL_STATUSES | {"start"}
+
+# Seconds a container's start event waits so restart bursts collapse into one stream
+_START_DEBOUNCE_DELAY = 0.2
+
+# Lifecycle events buffered for Logfire before new ones are dropped
+_EVENT_QUEUE_SIZE = 10_000
+
+# Log streams opened concurrently at startup, and how long one may hold its slot
+_STARTUP_STREAM_LIMIT = 32
+_STARTUP_STREAM_TIMEOUT = 1.0
+
+# Seconds between progress reports while active tasks wind down at shutdown
+_SHUTDOWN_PROGRESS_INTERVAL = 5.0
+
+# Seconds between reports of the blocking-call thread pool's load
+_EXECUTOR_METRICS_INTERVAL = 10.0
+
 
 class DockerLogfire:
     """Main application class that orchestrates container monitoring and log forwarding."""
 
     def __init__(self) -> None:
         """Initialize the application."""
-        self.settings = Settings()  # type: ignore[call-arg]
-        self.monitor = ContainerMonitor(self.settings)
-        self.forwarder = LogForwarder(self.settings)
+        self.settings = get_settings()
+
+        # Share one long-lived client of each kind so connections are pooled and reused.
+        # Every executor thread may hold a pooled connection during a blocking call, so
+        # the pool must be at least that large or urllib3 serializes the lookups
+        self.client = docker.DockerClient(
+            base_url=self.settings.docker_url,
+            timeout=self.settings.docker_timeout,
+            max_pool_size=self.settings.docker_pool_connections,
+        )
+        # Log streams and the event subscription share aiodocker's connector, whose
+        # default limit would block them all once enough streams are open
+        self._aio_connector = aiohttp.UnixConnector(
+            path=self.settings.docker_socket, limit=self.settings.stream_pool_connections
+        )
+        # With a custom connector the URL only supplies the scheme and a placeholder host
+        self.aio_client = aiodocker.Docker(url="unix://localhost", connector=self._aio_connector)
+
+        self.monitor = ContainerMonitor(self.settings, self.client, self.aio_client)
+        self.forwarder = LogForwarder(self.settings, self.aio_client)
         self.active_tasks: set[asyncio.Task[Any]] = set()
-        self.executor = ThreadPoolExecutor(max_workers=10)
-        self.running = True
+        # Log stream task per container short ID, and start events still being debounced
+        self._container_tasks: dict[str, asyncio.Task[None]] = {}
+        self._pending_starts: dict[str, asyncio.TimerHandle] = {}
+        self._loop = asyncio.get_running_loop()
 
-        # Set logging level
-        logging.getLogger().setLevel(self.settings.log_level)
+        # asyncio.to_thread runs on the loop's default executor; size it for Docker I/O
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.settings.executor_workers, thread_name_prefix="docker-io"
+        )
+        self._loop.set_default_executor(self.executor)
+
+        self._stop_event = asyncio.Event()
+        # Streams are only capped when configured; a waiting container misses its logs
+        self._stream_slots = (
+            asyncio.Semaphore(self.settings.max_concurrent_streams)
+            if self.settings.max_concurrent_streams is not None
+            else None
+        )
+        self.event_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=_EVENT_QUEUE_SIZE)
 
     async def handle_container_event(self, event: dict[str, Any]) -> None:
         """Handle container lifecycle events."""
         status = event.get("status")
+        # The daemon already filters the stream, but don't trust it for unrelated events
+        if event.get("Type", "container") != "container" or status not in _HANDLED_STATUSES:
+            return
+
         container_id = event.get("id", "")[:12]
 
-        await self.forwarder.handle_container_event(event)
+        # Lifecycle records are forwarded in batches by forward_container_events
+        try:
+            self.event_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Event queue full, dropping %s event for %s", status, container_id)
 
         if status == "start":
-            # Start monitoring new container
-            try:
-                container = self.monitor.client.containers.get(container_id)
-                if self.monitor.should_monitor_container(container):
-                    task = asyncio.create_task(self.monitor_container_with_retry(container))
-                    self.active_tasks.add(task)
-                    task.add_done_callback(self.active_tasks.discard)
-            except Exception as e:
-                logger.error(f"Failed to start monitoring container {container_id}: {e}")
-
-        elif status in ["stop", "die"]:
-            # Container stopped, log stream will end naturally
-            pass
+            # Excluded containers are known from the event alone; skip the API lookup
+            container_name = event.get("Actor", {}).get("Attributes", {}).get("name", "")
+            if container_name in self.settings.exclude_set:
+                logger.debug("Skipping excluded container: %s", container_name)
+                return
+
+            # Restart loops emit bursts of starts; only act once the container settles
+            pending_start = self._pending_starts.pop(container_id, None)
+            if pending_start is not None:
+                pending_start.cancel()
+            self._pending_starts[container_id] = self._loop.call_later(
+                _START_DEBOUNCE_DELAY, self._start_after_debounce, container_id
+            )
+
+        elif status in _TERMINAL_STATUSES:
+            # Container stopped, log stream will end naturally; drop its cached
+            # lookups so long-running hosts don't accumulate dead entries
+            self.monitor.forget_container(container_id)
     
-    async def monitor_container_with_retry(self, container: Container, max_retries: int = 3) -> None:
+    def _start_after_debounce(self, container_id: str) -> None:
+        """Begin monitoring a started container unless it already has a log stream."""
+        del self._pending_starts[container_id]
+        if container_id in self._container_tasks or self._stop_event.is_set():
+            return
+
+        self._spawn(self.start_new_container(container_id))
+
+    async def start_new_container(self, container_id: str) -> None:
+        """Look up a newly started container and monitor it if it qualifies."""
+        try:
+            # docker-py is synchronous, so keep the lookup off the event loop
+            container = await asyncio.to_thread(self.client.containers.get, container_id)
+            if self.monitor.should_monitor_container(container):
+                self.create_monitoring_task(container)
+        except Exception as e:
+            logger.error("Failed to start monitoring container %s: %s", container_id, e)
+
+    def create_monitoring_task(
+        self, container: Container, stream_started: asyncio.Event | None = None
+    ) -> None:
+        """Start following a container's logs unless a stream for it is already running."""
+        container_id = container.short_id
+        if container_id in self._container_tasks:
+            if stream_started is not None:
+                stream_started.set()
+            return
+
+        self._container_tasks[container_id] = self._spawn(
+            self.monitor_container_with_retry(container, stream_started=stream_started),
+            name=container_id,
+        )
+
+    def _spawn(
+        self, coro: Coroutine[Any, Any, None], name: str | None = None
+    ) -> asyncio.Task[None]:
+        """Start a tracked background task, cleaned up by _reap when it finishes."""
+        task = asyncio.create_task(coro, name=name)
+        self.active_tasks.add(task)
+        task.add_done_callback(self._reap)
+        return task
+
+    def _reap(self, task: asyncio.Task[Any]) -> None:
+        """Stop tracking a finished task and log it if it failed."""
+        self.active_tasks.discard(task)
+        # Log stream tasks are named after their container's short ID
+        name = task.get_name()
+        if self._container_tasks.get(name) is task:
+            del self._container_tasks[name]
+
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            logger.error("Task %s failed: %s", name, exc)
+
+    async def forward_container_events(self) -> None:
+        """Forward queued lifecycle events to Logfire in batches."""
+        batch_size = self.settings.event_batch_size
+        batch_wait = self.settings.event_batch_ms / 1000
+        batch: list[dict[str, Any]] = []
+
+        try:
+            while True:
+                batch.append(await self.event_queue.get())
+
+                # Collect more events until the batch is full or the window closes
+                deadline = self._loop.time() + batch_wait
+                while len(batch) < batch_size:
+                    remaining = deadline - self._loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.event_queue.get(), remaining))
+                    except TimeoutError:
+                        break
+
+                await self.forwarder.handle_container_events(batch)
+                batch = []
+        finally:
+            # Forward whatever is still pending so events aren't lost on shutdown
+            while not self.event_queue.empty():
+                batch.append(self.event_queue.get_nowait())
+            if batch:
+                await self.forwarder.handle_container_events(batch)
+
+    async def report_executor_metrics(self) -> None:
+        """Periodically report how busy the blocking-call thread pool is."""
+        # Worker threads are never retired, so this tracks the pool's high-water mark
+        threads = logfire.metric_gauge(
+            "executor.threads", description="Worker threads started by the Docker I/O pool"
+        )
+        queue_depth = logfire.metric_gauge(
+            "executor.queue_depth", description="Blocking calls waiting for a free worker thread"
+        )
+
+        while True:
+            # ThreadPoolExecutor has no public accessors for its load
+            threads.set(len(self.executor._threads))
+            queue_depth.set(self.executor._work_queue.qsize())
+            await asyncio.sleep(_EXECUTOR_METRICS_INTERVAL)
+
+    async def monitor_container_with_retry(
+        self,
+        container: Container,
+        max_retries: int = 3,
+        stream_started: asyncio.Event | None = None,
+    ) -> None:
         """Monitor container logs with retry logic."""
-        container_name = container.name.lstrip("/") if container.name else container.short_id
+        container_name = self.monitor.get_container_name(container)
+        container_image = await asyncio.to_thread(self.monitor.get_container_image, container)
         retry_count = 0
         base_delay = 1  # Start with 1 second
         
-        while retry_count < max_retries and self.running:
-            try:
-                await self.forwarder.stream_container_logs(container)
-                # If we reach here, streaming ended normally (container stopped)
-                break
-            except Exception as e:
-                retry_count += 1
-                if retry_count < max_retries:
-                    delay = base_delay * (2 ** retry_count)  # Exponential backoff
-                    logger.warning(
-                        f"Log streaming failed for {container_name}, retrying in {delay}s "
-                        f"(attempt {retry_count}/{max_retries}): {e}"
+        # Hold a stream slot, if capped, for as long as this container is being followed
+        stream_slot = self._stream_slots or contextlib.nullcontext()
+        if self._stream_slots is not None and self._stream_slots.locked():
+            logger.warning(
+                "All %d stream slots are in use, %s waits for one to free up",
+                self.settings.max_concurrent_streams,
+                container_name,
+            )
+            # Waiting here isn't opening a stream, so free the caller's startup slot
+            if stream_started is not None:
+                stream_started.set()
+                stream_started = None
+        async with stream_slot:
+            while retry_count < max_retries and not self._stop_event.is_set():
+                try:
+                    await self.forwarder.stream_container_logs(
+                        container, container_name, container_image, stream_started
                     )
-                    await asyncio.sleep(delay)
-                else:
-                    logger.error(f"Failed to stream logs for {container_name} after {max_retries} attempts")
+                    # If we reach here, streaming ended normally (container stopped)
+                    break
+                except Exception as e:
+                    if self._is_unrecoverable(e):
+                        logger.info("Container %s no longer exists, not retrying", container_name)
+                        break
+
+                    retry_count += 1
+                    if retry_count < max_retries:
+                        # Capped exponential backoff with jitter so streams don't retry in lockstep
+                        delay = min(self.settings.max_retry_delay, base_delay * (2**retry_count))
+                        delay *= 1 + random.random() * self.settings.retry_jitter
+                        logger.warning(
+                            "Log streaming failed for %s, retrying in %.1fs (attempt %d/%d): %s",
+                            container_name,
+                            delay,
+                            retry_count,
+                            max_retries,
+                            e,
+                        )
+                        await asyncio.sleep(delay)
+                    else:
+                        logger.error(
+                            "Failed to stream logs for %s after %d attempts",
+                            container_name,
+                            max_retries,
+                        )
+
+    @staticmethod
+    def _is_unrecoverable(error: Exception) -> bool:
+        """Check whether retrying cannot help, i.e. the container is gone."""
+        if isinstance(error, NotFound):
+            return True
+        return isinstance(error, aiodocker.DockerError) and error.status == 404
 
     async def monitor_existing_containers(self) -> None:
         """Start monitoring all existing containers."""
-        containers = self.monitor.list_containers()
+        containers = await asyncio.to_thread(self.monitor.list_containers)
+
+        # Ramp up log streams a slice at a time instead of opening them all at once
+        startup_slots = asyncio.Semaphore(_STARTUP_STREAM_LIMIT)
+        async with asyncio.TaskGroup() as tg:
+            for container in containers:
+                tg.create_task(self.start_container_monitoring(container, startup_slots))
 
-        for container in containers:
-            if self.running:
-                container_name = container.name.lstrip("/") if container.name else container.short_id
-                logger.info(f"Creating monitoring task for container: {container_name}")
-                task = asyncio.create_task(self.monitor_container_with_retry(container))
-                self.active_tasks.add(task)
-                task.add_done_callback(self.active_tasks.discard)
+    async def start_container_monitoring(
+        self, container: Container, startup_slots: asyncio.Semaphore
+    ) -> None:
+        """Start a monitoring task, holding a startup slot until its stream delivers data."""
+        async with startup_slots:
+            if self._stop_event.is_set():
+                return
 
-    async def run_event_monitor(self) -> None:
-        """Run the event monitor."""
-        await self.monitor.watch_events(self.handle_container_event)
+            container_name = self.monitor.get_container_name(container)
+            logger.info("Creating monitoring task for container: %s", container_name)
+            stream_started = asyncio.Event()
+            self.create_monitoring_task(container, stream_started)
+
+            # Idle containers may never log, so only hold the slot for a bounded time
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(stream_started.wait(), _STARTUP_STREAM_TIMEOUT)
 
     async def run(self) -> None:
         """Run the main application loop."""
         logger.info("Starting Docker Logfire")
-        logfire.info("Docker Logfire started", version="0.1.0")
 
         try:
-            # Start monitoring existing containers
-            await self.monitor_existing_containers()
+            # Forward lifecycle events in the background
+            forward_task = asyncio.create_task(self.forward_container_events())
+            metrics_task = asyncio.create_task(self.report_executor_metrics())
+
+            # Watch for container events first so none are missed during the startup ramp
+            event_task = asyncio.create_task(self.monitor.watch_events(self.handle_container_event))
 
-            # Start watching for new container events
-            event_task = asyncio.create_task(self.run_event_monitor())
+            # Ramp up existing containers in the background; starts seen by the event
+            # watcher meanwhile are deduplicated by create_monitoring_task
+            self._spawn(self.monitor_existing_containers())
 
-            # Keep running until interrupted
-            while self.running:
-                await asyncio.sleep(1)
+            # Keep running until a shutdown signal arrives or the event watcher dies
+            stop_task = asyncio.create_task(self._stop_event.wait())
+            done, pending = await asyncio.wait(
+                {event_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if event_task in done and not event_task.cancelled() and event_task.exception():
+                logger.error("Container event monitor failed: %s", event_task.exception())
+            self._stop_event.set()
 
-            # Cancel event monitoring
-            event_task.cancel()
+            # Stop event monitoring and wait for it to release its connection
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            metrics_task.cancel()
 
-            # Wait for all active tasks to complete
-            if self.active_tasks:
-                logger.info(f"Waiting for {len(self.active_tasks)} active tasks to complete...")
-                await asyncio.gather(*self.active_tasks, return_exceptions=True)
+            # Flush any lifecycle events still queued
+            forward_task.cancel()
+            await asyncio.gather(forward_task, return_exceptions=True)
+
+            # Followed log streams never end on their own, so cancel them; each
+            # flushes its buffered lines as it unwinds
+            pending = set(self.active_tasks)
+            if pending:
+                logger.info("Stopping %d active tasks...", len(pending))
+                for task in pending:
+                    task.cancel()
+                while pending:
+                    _, pending = await asyncio.wait(pending, timeout=_SHUTDOWN_PROGRESS_INTERVAL)
+                    if pending:
+                        logger.info("Still waiting for %d active tasks...", len(pending))
 
         except Exception as e:
-            logger.error(f"Application error: {e}")
+            logger.error("Application error: %s", e)
             raise
         finally:
-            self.executor.shutdown(wait=True)
+            self.client.close()
+            await self.aio_client.close()
+            await self._aio_connector.close()
             logger.info("Docker Logfire stopped")
 
     def shutdown(self, signum: int, frame: Any) -> None:
         """Handle shutdown signals."""
-        logger.info(f"Received signal {signum}, shutting down...")
-        self.running = False
+        logger.info("Received signal %s, shutting down...", signal.Signals(signum).name)
+        # Thread-safe so the signal.signal fallback can call this outside the loop
+        self._loop.call_soon_threadsafe(self._stop_event.set)
 
 
-def main() -> None:
-    """Main entry point."""
+async def run_app() -> None:
+    """Create the application on the running event loop and run it."""
+    # The async Docker client opens an aiohttp session, which needs a running loop
     app = DockerLogfire()
 
-    # Set up signal handlers
-    signal.signal(signal.SIGINT, app.shutdown)
-    signal.signal(signal.SIGTERM, app.shutdown)
+    # Set up signal handlers; the event loop only supports them outside Windows
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        if sys.platform == "win32":
+            signal.signal(sig, app.shutdown)
+        else:
+            asyncio.get_running_loop().add_signal_handler(sig, app.shutdown, sig, None)
+
+    await app.run()
+
 
+def get_loop_factory(settings: Settings) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return uvloop's event loop factory if enabled and installed."""
+    if not settings.use_uvloop:
+        return None
+
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop is not installed, using the default asyncio event loop")
+        return None
+
+    return uvloop.new_event_loop
+
+
+class _RawQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is instead of formatting it on the calling thread."""
+        # Log arguments here are immutable values, so formatting them later is safe
+        return record
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue so formatting and output happen off the event loop."""
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root = logging.getLogger()
+    root.addHandler(_RawQueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+def main() -> None:
+    """Main entry point."""
+    listener = configure_logging()
     try:
-        asyncio.run(app.run())
+        settings = get_settings()
+        # Apply the configured level once, before any component checks it
+        logging.getLogger().setLevel(settings.log_level)
+
+        with asyncio.Runner(loop_factory=get_loop_factory(settings)) as runner:
+            runner.run(run_app())
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":